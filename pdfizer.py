@@ -1,12 +1,28 @@
 import re
-from pprint import pprint
-from io import BytesIO
+import copy
+import logging
+import threading
+from functools import cache, lru_cache
+from pprint import pformat
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_LEFT
+# ReportLab is imported where it is first needed, so importing this module
+# (which Streamlit does on every script rerun) stays cheap.
+
+logger = logging.getLogger(__name__)
+
+# -- Precompiled regex patterns used by parse_text_to_structure --
+# These run as separate passes on purpose: each pattern starts with a literal
+# or a character class, which lets the regex engine skip ahead to candidate
+# positions. A single alternation of all of them has to be tried at every
+# character and measured about four times slower.
+_RE_DASH = re.compile(r"\s+\-")
+_RE_SENT = re.compile(r"Sentence\s*\d+:\s*")
+_RE_TRANS = re.compile(r"\n\nTranscription\(s\):", re.DOTALL)
+_RE_REC = re.compile(r"Recommendation\(s\):")
+
+# Regex pattern for main sections (e.g., A.) and subsections (e.g., A.1).
+# Group 2 (the subsection digits) is None for a main section.
+_RE_LINE = re.compile(r'^([A-Z]\.)(\d+)?\s+(.*)')
 
 def parse_text_to_structure(data):
     """
@@ -19,80 +35,170 @@ def parse_text_to_structure(data):
     Returns:
         list: A list of dictionaries representing the structured data.
     """
-    import re
-    data = re.sub("Score:.*", "", data, flags=re.DOTALL)
-    data = re.sub(r"\s+\-", "\n&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;-&nbsp;", data)
-    data = re.sub(r"Sentence\s*\d+:\s*", "&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;-&nbsp;", data)
-    data = re.sub(r"\n\nTranscription\(s\):", "<br/>", data, flags=re.DOTALL)
-    data = re.sub(r"Recommendation\(s\):", "<br/>Recommendation(s):", data)
-    
-    # Define regex patterns for main sections and subsections
-    main_section_pattern = re.compile(r'^([A-Z]\.)\s+(.*)')
-    subsection_pattern = re.compile(r'^([A-Z]\.\d+)\s+(.*)')
+    # Drop the score and everything after it
+    score_at = data.find("Score:")
+    if score_at >= 0:
+        data = data[:score_at]
+    data = _RE_DASH.sub("\n&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;-&nbsp;", data)
+    data = _RE_SENT.sub("&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;-&nbsp;", data)
+    data = _RE_TRANS.sub("<br/>", data)
+    data = _RE_REC.sub("<br/>Recommendation(s):", data)
     
     # Initialize the structured list
     structured_data = []
     current_main = None
     current_subsection = None
     
+    # Index sections and subsections by number for constant-time lookups
+    main_index = {}
+    sub_indices = {}
+    current_sub_index = None
+    
+    # Bound append of the text list that plain lines currently go to (the
+    # current subsection's, else the current main section's). Keeping it in a
+    # local turns the common per-line path into a single call.
+    append_text = None
+    match_line = _RE_LINE.match
+    
     # Split the input data into lines (do not strip them, to preserve indentation/format)
     lines = data.splitlines()
     
     for line_num, line in enumerate(lines, start=1):
-        stripped_line = line
-        if not stripped_line:
+        if not line:
             continue  # Skip empty lines
         
-        # Check for main section (e.g., A.)
-        main_match = main_section_pattern.match(stripped_line)
-        if main_match:
-            main_number = main_match.group(1)
-            main_text = main_match.group(2)
-            # Check if this main section already exists
-            existing_main = next((section for section in structured_data if section['number'] == main_number), None)
-            if existing_main:
-                current_main = existing_main
-            else:
-                # Create a new main section entry
-                current_main = {
-                    'number': main_number,
-                    'text': main_text,
-                    'subsections': []
-                }
-                structured_data.append(current_main)
-            current_subsection = None  # Reset current subsection
-            continue
+        # Headings start with "X." (X in A-Z); screen for that before running the
+        # regex so that plain content lines skip it entirely
+        if 'A' <= line[0] <= 'Z' and line[1:2] == '.':
+            line_match = match_line(line)
+        else:
+            line_match = None
         
-        # Check for subsection (e.g., A.1)
-        sub_match = subsection_pattern.match(stripped_line)
-        if sub_match and current_main:
-            sub_number = sub_match.group(1)
-            sub_text = sub_match.group(2)
-            # Check if this subsection already exists
-            existing_sub = next((sub for sub in current_main['subsections'] if sub['number'] == sub_number), None)
-            if existing_sub:
-                # Append content to existing subsection
-                existing_sub['text'] += f'\n{sub_text}'
-                current_subsection = existing_sub
-            else:
-                # Create a new subsection
-                current_subsection = {
-                    'number': sub_number,
-                    'text': sub_text
-                }
-                current_main['subsections'].append(current_subsection)
-            continue
+        if line_match:
+            letter, digits, heading_text = line_match.groups()
+            
+            # Check for main section (e.g., A.)
+            if digits is None:
+                main_number = letter
+                # Check if this main section already exists
+                current_main = main_index.get(main_number)
+                if current_main is None:
+                    # Create a new main section entry
+                    current_main = {
+                        'number': main_number,
+                        'text': [heading_text],
+                        'subsections': []
+                    }
+                    structured_data.append(current_main)
+                    main_index[main_number] = current_main
+                    sub_indices[main_number] = {}
+                current_sub_index = sub_indices[main_number]
+                current_subsection = None  # Reset current subsection
+                append_text = current_main['text'].append
+                continue
+            
+            # Check for subsection (e.g., A.1)
+            if current_main:
+                sub_number = letter + digits
+                # Check if this subsection already exists
+                current_subsection = current_sub_index.get(sub_number)
+                if current_subsection:
+                    # Append content to existing subsection
+                    current_subsection['text'].append(heading_text)
+                else:
+                    # Create a new subsection
+                    current_subsection = {
+                        'number': sub_number,
+                        'text': [heading_text]
+                    }
+                    current_main['subsections'].append(current_subsection)
+                    current_sub_index[sub_number] = current_subsection
+                append_text = current_subsection['text'].append
+                continue
         
         # If the line doesn't match main or subsection, append it to the current subsection or main section
-        if current_subsection:
-            current_subsection['text'] += f'\n{stripped_line}'
-        elif current_main:
-            current_main['text'] += f'\n{stripped_line}'
+        if append_text is not None:
+            append_text(line)
         else:
-            print(f"Warning: Line {line_num} is outside of any section or subsection: {stripped_line}")
+            logger.warning("Line %d is outside of any section or subsection: %s", line_num, line)
+    
+    # Text is collected as a list of lines while parsing; join each one once
+    # here instead of concatenating strings on every appended line
+    for section in structured_data:
+        section['text'] = '\n'.join(section['text'])
+        for subsection in section['subsections']:
+            subsection['text'] = '\n'.join(subsection['text'])
     
     return structured_data
 
+@cache
+def _cell_paragraph_class():
+    """
+    Builds the Paragraph subclass used for table cells the first time it is needed.
+    
+    Platypus wraps every cell Paragraph several times for the same column width:
+    once to size the table's rows, again for the part of the table left over
+    after a page break, and once more to draw it. Paragraph.wrap only depends on
+    the available width, so the subclass keeps the result of its last wrap and
+    returns it when called again with the same width.
+    
+    Returns:
+        type: A Paragraph subclass with a memoized wrap().
+    """
+    from reportlab.platypus import Paragraph
+    
+    class CellParagraph(Paragraph):
+        _wrapped = None
+        
+        def wrap(self, availWidth, availHeight):
+            if self._wrapped is None or self._wrapped[0] != availWidth:
+                self._wrapped = (availWidth, super().wrap(availWidth, availHeight))
+            return self._wrapped[1]
+    
+    return CellParagraph
+
+@lru_cache(maxsize=512)
+def _cached_para(text, style_key):
+    return _cell_paragraph_class()(text, _styles()[style_key])
+
+def _make_para(text, style_key):
+    """
+    Returns a Paragraph for the given text and style, reusing the parsed markup
+    of identical rows.
+    
+    ReportLab stores layout state on a Paragraph when it is wrapped, so callers
+    get a shallow copy of the cached instance rather than the instance itself.
+    
+    Args:
+        text (str): The Paragraph markup.
+        style_key (str): Key of the style in _styles() ('header' or 'content').
+    
+    Returns:
+        Paragraph: A Paragraph ready to be placed in a table.
+    """
+    return copy.copy(_cached_para(text, style_key))
+
+@lru_cache(maxsize=1024)
+def _markup_content(text):
+    """
+    Converts subsection text into the Paragraph markup of a content row.
+    Results are cached, since regenerated forms repeat the same subsections.
+    
+    Args:
+        text (str): The subsection number and text, lines separated by newlines.
+    
+    Returns:
+        str: The content row markup.
+    """
+    # Optional: bold any "Xyz:" lines, joining lines with <br/> for
+    # multiline rendering
+    content_text = '<br/>'.join(
+        f"<b>{line}</b>" if ':' in line else line
+        for line in text.split('\n')
+    )
+    # Add extra spacing
+    return f"<br/>{content_text}<br/><br/>"
+
 def create_table_data(structured_data):
     """
     Converts structured data into table data with Paragraphs.
@@ -103,32 +209,25 @@ def create_table_data(structured_data):
     Returns:
         list: Table data suitable for ReportLab's Table.
     """
-    import re
-    
     table_data = []
     
     for section in structured_data:
         # Create a 'header row'
         header_text = f"{section['number']} {section['text']}".replace('\n', '<br/>')
-        header_para = Paragraph(header_text, header_para_style)
+        header_para = _make_para(header_text, 'header')
         table_data.append([header_para])
         
         # Now process each subsection
         for subsection in section['subsections']:
-            content_text = f"{subsection['number']} {subsection['text']}"
-            # Optional: bold any "Xyz:" lines
-            pattern = r'^(.*?:.*)$'
-            content_text = re.sub(pattern, r'<b>\1</b>', content_text, flags=re.MULTILINE | re.IGNORECASE)
-            # Replace newlines with <br/> for multiline rendering
-            content_text = content_text.replace('\n', '<br/>')
-            # Add extra spacing
-            content_text = f"<br/>{content_text}<br/><br/>"
-            
-            content_para = Paragraph(content_text, content_para_style)
+            content_text = _markup_content(f"{subsection['number']} {subsection['text']}")
+            content_para = _make_para(content_text, 'content')
             table_data.append([content_para])
     
     return table_data
 
+# Per-thread PDF output buffer, reused across generate_pdf_in_memory calls
+_tls = threading.local()
+
 def generate_pdf_in_memory(table_data, table_style):
     """
     Generates a PDF with a simple header and the given table data and styles, returning PDF bytes.
@@ -140,9 +239,17 @@ def generate_pdf_in_memory(table_data, table_style):
     Returns:
         bytes: The generated PDF in bytes.
     """
-    from reportlab.platypus import SimpleDocTemplate, Table
+    from io import BytesIO
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph
     
-    buffer = BytesIO()
+    # Reuse this thread's buffer instead of allocating a new one per PDF
+    buffer = getattr(_tls, 'buffer', None)
+    if buffer is None:
+        buffer = _tls.buffer = BytesIO()
+    else:
+        buffer.seek(0)
+        buffer.truncate(0)
     
     # Create a PDF document in memory
     pdf = SimpleDocTemplate(
@@ -155,22 +262,9 @@ def generate_pdf_in_memory(table_data, table_style):
     )
     elements = []
     
-    # Define styles
-    styles = getSampleStyleSheet()
-    header_style = ParagraphStyle(
-        name='HeaderStyle',
-        parent=styles['Title'],  # Inherits from 'Title' style
-        fontName='Helvetica-Bold',
-        fontSize=10,
-        leading=22,
-        alignment=1,  # Center
-        spaceAfter=20,
-        textColor=colors.gray
-    )
-    
     # Create the header Paragraph
     header_text = "<u>CALL QUALITY MONITORING FORM</u>"
-    header = Paragraph(header_text, header_style)
+    header = Paragraph(header_text, _styles()['title'])
     elements.append(header)
     
     # Create the table (single column width 500)
@@ -183,52 +277,74 @@ def generate_pdf_in_memory(table_data, table_style):
     # Build the PDF
     pdf.build(elements)
     
-    # Retrieve the PDF bytes
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+    # Retrieve the PDF bytes; the buffer stays open for the next call
+    return buffer.getvalue()
 
 # -- Initialize ReportLab styles --
-styles = getSampleStyleSheet()
-
-# Define a style for header rows
-header_para_style = ParagraphStyle(
-    'HeaderStyle',
-    parent=styles['Normal'],
-    fontName='Times-Bold',
-    fontSize=12,
-    textColor=colors.white,
-    alignment=TA_LEFT
-)
-
-# Define a style for content rows
-content_para_style = ParagraphStyle(
-    'ContentStyle',
-    parent=styles['Normal'],
-    fontName='Times-Roman',
-    fontSize=10,
-    textColor=colors.black,
-    alignment=TA_LEFT
-)
-
-# Define table styles
-table_style = TableStyle([
-    # Grid lines for all cells
-    ('GRID', (0,0), (-1,-1), 1, colors.black),
-    
-    # Alignment for all cells
-    ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-    
-    # Padding for all cells
-    ('VALIGN', (0,0), (-1,-1), 'TOP'),
-    ('LEFTPADDING', (0,0), (-1,-1), 5),
-    ('RIGHTPADDING', (0,0), (-1,-1), 5),
-    ('TOPPADDING', (0,0), (-1,-1), 5),
-    ('BOTTOMPADDING', (0,0), (-1,-1), 5),
-])
-
-# Define the header background color
-header_background = colors.Color(0/255, 51/255, 102/255)  # RGB (0, 51, 102)
+@cache
+def _styles():
+    """
+    Builds all ReportLab styles the first time they are needed, once per process.
+    
+    Returns:
+        dict: ParagraphStyles for the 'header' and 'content' table rows and the
+        document 'title', the base 'table' TableStyle and the
+        'header_background' colour of header rows.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_LEFT
+    from reportlab.platypus import TableStyle
+    
+    styles = getSampleStyleSheet()
+    return {
+        # Define a style for header rows
+        'header': ParagraphStyle(
+            'HeaderStyle',
+            parent=styles['Normal'],
+            fontName='Times-Bold',
+            fontSize=12,
+            textColor=colors.white,
+            alignment=TA_LEFT
+        ),
+        # Define a style for content rows
+        'content': ParagraphStyle(
+            'ContentStyle',
+            parent=styles['Normal'],
+            fontName='Times-Roman',
+            fontSize=10,
+            textColor=colors.black,
+            alignment=TA_LEFT
+        ),
+        # Define a style for the document title
+        'title': ParagraphStyle(
+            name='HeaderStyle',
+            parent=styles['Title'],  # Inherits from 'Title' style
+            fontName='Helvetica-Bold',
+            fontSize=10,
+            leading=22,
+            alignment=1,  # Center
+            spaceAfter=20,
+            textColor=colors.gray
+        ),
+        # Define table styles, shared by every generated table
+        'table': TableStyle([
+            # Grid lines for all cells
+            ('GRID', (0,0), (-1,-1), 1, colors.black),
+            
+            # Alignment for all cells
+            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+            
+            # Padding for all cells
+            ('VALIGN', (0,0), (-1,-1), 'TOP'),
+            ('LEFTPADDING', (0,0), (-1,-1), 5),
+            ('RIGHTPADDING', (0,0), (-1,-1), 5),
+            ('TOPPADDING', (0,0), (-1,-1), 5),
+            ('BOTTOMPADDING', (0,0), (-1,-1), 5),
+        ]),
+        # Define the header background color
+        'header_background': colors.Color(0/255, 51/255, 102/255),  # RGB (0, 51, 102)
+    }
 
 def pdfizer(text):
     """
@@ -240,26 +356,32 @@ def pdfizer(text):
     Returns:
         bytes: The PDF bytes, suitable for downloading or further processing.
     """
+    from reportlab.platypus import TableStyle
+    
     # 1. Parse the text
     parsed_structure = parse_text_to_structure(text)
-    # print("Parsed Structure:")
-    # pprint(parsed_structure)
+    # Only format the (potentially large) structure when debug logging is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Parsed Structure:\n%s", pformat(parsed_structure))
     
     # 2. Create table data
     table_data = create_table_data(parsed_structure)
     
-    # 3. Style the rows (header vs. default)
-    #    We detect header rows by checking the 'HeaderStyle' in the Paragraph
-    for idx, row in enumerate(table_data):
-        if row and len(row) > 0:
-            # Check if 'HeaderStyle' is in the Paragraph style name
-            if 'HeaderStyle' in row[0].style.name:
-                table_style.add('BACKGROUND', (0, idx), (-1, idx), header_background)
-            else:
-                table_style.add('BACKGROUND', (0, idx), (-1, idx), colors.white)
+    # 3. Style the header rows; content rows keep the default (white) background.
+    #    We detect header rows by checking the 'HeaderStyle' in the Paragraph.
+    #    The commands go on a per-call copy so the shared base style does not
+    #    keep growing with every generated PDF.
+    styles = _styles()
+    header_background = styles['header_background']
+    header_rows = [idx for idx, row in enumerate(table_data)
+                   if row and row[0].style.name == 'HeaderStyle']
+    row_style = TableStyle(
+        [('BACKGROUND', (0, idx), (-1, idx), header_background) for idx in header_rows],
+        parent=styles['table']
+    )
     
     # 4. Generate PDF in memory
-    pdf_bytes = generate_pdf_in_memory(table_data, table_style)
+    pdf_bytes = generate_pdf_in_memory(table_data, row_style)
     
-    print("\nPDF was generated in memory successfully.")
+    logger.debug("PDF was generated in memory successfully.")
     return pdf_bytes